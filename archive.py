@@ -0,0 +1,239 @@
+"""
+daily_pushes 表的数据保留与归档
+
+按月滚动归档：超出热数据保留期的整月数据导出为压缩的 JSONL 文件
+（archive/daily_pushes-YYYY-MM.jsonl.gz），并记录到 archive/index.json，
+随后从数据库中删除，保持热表精简、写入速度稳定。
+
+用法：
+    python archive.py              立即执行一次归档
+    python archive.py 2025-01      读取并输出某月的归档数据
+"""
+import datetime
+import gzip
+import json
+import os
+import sys
+import pymysql
+from config import DB_CONFIG
+from models import DailyReport
+
+# 保留与归档配置（旧版config.py中可能没有该项，使用默认值）
+try:
+    from config import RETENTION_CONFIG
+except ImportError:
+    RETENTION_CONFIG = {}
+
+# 归档会删除数据库中的数据，需在配置中显式开启后才会在每次运行后自动执行
+ARCHIVE_ENABLED = RETENTION_CONFIG.get('enabled', False)
+# 数据库中保留最近多少天的数据（按整月归档，实际保留天数会略多于该值）
+HOT_DAYS = RETENTION_CONFIG.get('hot_days', 90)
+# 归档文件目录，相对路径基于脚本所在目录
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           RETENTION_CONFIG.get('archive_dir', 'archive'))
+INDEX_FILE = 'index.json'
+# 每条 DELETE 语句最多删除的行数
+DELETE_BATCH = 500
+
+
+def get_connection():
+    """
+    连接数据库（兼容 main.py 已将 cursorclass 转换为类的情况）
+    """
+    cursorclass = DB_CONFIG['cursorclass']
+    if isinstance(cursorclass, str):
+        cursorclass = getattr(pymysql.cursors, cursorclass.split('.')[-1])
+    return pymysql.connect(**dict(DB_CONFIG, cursorclass=cursorclass))
+
+
+def month_start(date):
+    return date.replace(day=1)
+
+
+def next_month(date):
+    return (date.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def archive_file_name(month):
+    return f"daily_pushes-{month}.jsonl.gz"
+
+
+def to_archive_row(row):
+    """
+    将数据库行转换为可写入JSON的字典，JSON列解析为对象
+    """
+    result = {}
+    for key, value in row.items():
+        if key in ('weather_info', 'history_events', 'hot_searches') and isinstance(value, str):
+            value = json.loads(value)
+        elif isinstance(value, (datetime.date, datetime.datetime)):
+            value = value.isoformat()
+        elif isinstance(value, datetime.timedelta):
+            # pymysql 将 TIME 列返回为 timedelta
+            seconds = int(value.total_seconds())
+            value = f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        result[key] = value
+    return result
+
+
+def load_index(archive_dir=ARCHIVE_DIR):
+    path = os.path.join(archive_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fsync_dir(directory):
+    """
+    将目录项（os.replace 的结果）落盘，Windows 不支持对目录 fsync，直接跳过
+    """
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def save_index(index, archive_dir=ARCHIVE_DIR):
+    # 先写临时文件并落盘再替换，避免中断时索引损坏或丢失
+    path = os.path.join(archive_dir, INDEX_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+    fsync_dir(archive_dir)
+
+
+def read_archive_file(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_archive_month(month, rows, archive_dir=ARCHIVE_DIR):
+    """
+    将某月数据写入归档文件（与已有归档按 id 合并，重复执行结果不变），返回索引条目
+    """
+    path = os.path.join(archive_dir, archive_file_name(month))
+    merged = {}
+    if os.path.exists(path):
+        for row in read_archive_file(path):
+            merged[row['id']] = row
+    for row in rows:
+        merged[row['id']] = row
+    merged_rows = sorted(merged.values(), key=lambda r: (r['push_date'], r['id']))
+
+    # 归档文件落盘后才会删除数据库中的数据
+    with open(path + '.tmp', 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for row in merged_rows:
+                f.write((json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8'))
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(path + '.tmp', path)
+    fsync_dir(archive_dir)
+
+    return {
+        'file': archive_file_name(month),
+        'rows': len(merged_rows),
+        'first_date': merged_rows[0]['push_date'],
+        'last_date': merged_rows[-1]['push_date'],
+        'archived_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def archive_expired_pushes(hot_days=HOT_DAYS, archive_dir=ARCHIVE_DIR, today=None):
+    """
+    归档并删除超出保留期的整月数据，返回归档的行数
+    """
+    today = today or datetime.date.today()
+    cutoff = month_start(today - datetime.timedelta(days=hot_days))
+    os.makedirs(archive_dir, exist_ok=True)
+    index = load_index(archive_dir)
+    archived = 0
+
+    try:
+        conn = get_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW TABLES LIKE 'daily_pushes'")
+            if not cursor.fetchone():
+                return 0
+
+            cursor.execute("SELECT MIN(push_date) AS first_date FROM daily_pushes WHERE push_date < %s", (cutoff,))
+            first_date = cursor.fetchone()['first_date']
+            if first_date is None:
+                print(f"\n无需归档: 数据库中没有 {cutoff} 之前的数据")
+                return 0
+
+            # 逐月导出、写入归档文件后再删除，每月单独提交；
+            # 只按 id 删除已归档的行，导出与删除之间新写入该月的数据留待下次归档
+            month = month_start(first_date)
+            while month < cutoff:
+                month_end = next_month(month)
+                cursor.execute(
+                    "SELECT * FROM daily_pushes WHERE push_date >= %s AND push_date < %s ORDER BY push_date, id",
+                    (month, month_end))
+                rows = [to_archive_row(row) for row in cursor.fetchall()]
+                if rows:
+                    month_key = month.strftime('%Y-%m')
+                    index[month_key] = write_archive_month(month_key, rows, archive_dir)
+                    save_index(index, archive_dir)
+                    ids = [row['id'] for row in rows]
+                    for i in range(0, len(ids), DELETE_BATCH):
+                        batch = ids[i:i + DELETE_BATCH]
+                        cursor.execute(
+                            f"DELETE FROM daily_pushes WHERE id IN ({', '.join(['%s'] * len(batch))})", batch)
+                    conn.commit()
+                    archived += len(rows)
+                    print(f"已归档 {month_key}: {len(rows)} 条 -> {index[month_key]['file']}")
+                month = month_end
+
+        print(f"\n归档完成: 共归档 {archived} 条，数据库保留 {cutoff} 及之后的数据")
+        return archived
+
+    except pymysql.MySQLError as e:
+        print(f"\n归档时数据库错误: {e}")
+        raise
+    finally:
+        if 'conn' in locals() and conn.open:
+            conn.close()
+
+
+def read_archived_pushes(start_date=None, end_date=None, archive_dir=ARCHIVE_DIR):
+    """
+    按日期范围（含两端，'YYYY-MM-DD' 字符串）读取归档数据，通过索引只打开相关月份的文件
+    """
+    index = load_index(archive_dir)
+    for month in sorted(index):
+        entry = index[month]
+        if start_date and entry['last_date'] < start_date:
+            continue
+        if end_date and entry['first_date'] > end_date:
+            continue
+        for row in read_archive_file(os.path.join(archive_dir, entry['file'])):
+            if start_date and row['push_date'] < start_date:
+                continue
+            if end_date and row['push_date'] > end_date:
+                continue
+            yield row
+
+
+def read_archived_reports(start_date=None, end_date=None, archive_dir=ARCHIVE_DIR):
+    """
+    读取归档数据并还原为 DailyReport
+    """
+    for row in read_archived_pushes(start_date, end_date, archive_dir):
+        yield DailyReport.from_record(row)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        # 读取某月归档，如 2025-01
+        month = sys.argv[1]
+        for row in read_archived_pushes(f"{month}-01", f"{month}-31"):
+            print(json.dumps(row, ensure_ascii=False))
+    else:
+        archive_expired_pushes()
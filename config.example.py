@@ -43,7 +43,24 @@ API_URLS = {
     'image_url': 'https://img.8845.top/good'
 }
 
+# -------------------------- 推送时效配置 --------------------------
+# 各数据源并发获取，到达截止时间后立即推送已就绪的内容，未就绪的内容在页脚中标注
+# 截止时间之后才返回的内容会更新到数据库，并可选择补发一条简短的补充推送
+PUSH_CONFIG = {
+    'send_deadline': 30,     # 推送截止时间（从程序启动开始计时，单位：秒）
+    'late_followup': True    # 延迟到达的内容是否补发推送：True / False
+}
+
+# -------------------------- 数据保留与归档配置 --------------------------
+# 超出保留期的整月数据会导出到 archive_dir 下的 daily_pushes-YYYY-MM.jsonl.gz，
+# 并记录在 index.json 中，随后从数据库删除；可用 python archive.py 2025-01 查看归档
+RETENTION_CONFIG = {
+    'enabled': False,        # 每次运行后是否自动归档（会删除数据库中的旧数据，确认后再开启）：True / False
+    'hot_days': 90,          # 数据库中保留最近多少天的数据
+    'archive_dir': 'archive'  # 归档目录（相对于脚本所在目录）
+}
+
 # -------------------------- 日志配置 --------------------------
 # DEBUG=True：输出详细调试信息（开发/排查问题用）
 # DEBUG=False：仅输出关键信息（生产环境用）
-DEBUG = True  # 可选值：True / False
\ No newline at end of file
+DEBUG = True  # 可选值：True / False
\ No newline at end of file
@@ -1,35 +1,55 @@
 import requests
 import json
 import datetime
+import sys
 import pymysql
+from concurrent.futures import ThreadPoolExecutor, wait
 from config import DB_CONFIG, API_KEYS, API_URLS, DEBUG
+from models import WeatherInfo, HistoryEvent, HotSearchItem, DailyReport
+from archive import ARCHIVE_ENABLED, archive_expired_pushes
+from profiler import Profiler
+
+# 推送截止时间配置（旧版config.py中可能没有该项，使用默认值）
+try:
+    from config import PUSH_CONFIG
+except ImportError:
+    PUSH_CONFIG = {}
+
+# 到达截止时间（从程序开始计时，单位秒）时立即推送已就绪的内容
+SEND_DEADLINE = PUSH_CONFIG.get('send_deadline', 30)
+# 截止时间之后才返回的内容是否补发一条简短的补充推送
+LATE_FOLLOWUP = PUSH_CONFIG.get('late_followup', True)
+# 未就绪内容的提示语：开启补发时告知稍后补发，否则只会补充到推送记录中
+PENDING_HINT = '稍后补发' if LATE_FOLLOWUP else '稍后补充到推送记录'
 
 # 定义默认值，当API调用失败时使用
 def get_default_weather_info():
-    return {
-        'city': '未知',
-        'date': datetime.datetime.now().strftime('%Y-%m-%d'),
-        'day': '未知',
-        'weather': '数据获取失败',
-        'temp': '未知',
-        'feelsLike': '未知',
-        'highTemp': '未知',
-        'lowTemp': '未知',
-        'rh': '未知',
-        'wind': '未知'
-    }
+    return WeatherInfo(
+        date=datetime.datetime.now().strftime('%Y-%m-%d'),
+        weather='数据获取失败'
+    )
 
 def get_default_history_events():
-    return ['历史数据获取失败，请稍后再试']
+    return (HistoryEvent('历史数据获取失败，请稍后再试'),)
 
 def get_default_hot_searches():
-    return [{'title': '热搜数据获取失败', 'hot': ''}]
+    return (HotSearchItem('热搜数据获取失败'),)
 
 def get_default_ai_advice():
     return '由于数据问题，今日暂无天气建议 (´；ω；`)'
 
-# 动态导入cursorclass
-DB_CONFIG['cursorclass'] = getattr(pymysql.cursors, DB_CONFIG['cursorclass'].split('.')[-1])
+# 各服务的中文名称，用于日志和页脚提示
+SERVICE_NAMES = {
+    'weather': '天气数据',
+    'history': '历史事件',
+    'hot_searches': '热搜榜',
+    'image': '每日一图',
+    'ai': '天气建议'
+}
+
+# 动态导入cursorclass（重复导入时已是类，无需转换）
+if isinstance(DB_CONFIG['cursorclass'], str):
+    DB_CONFIG['cursorclass'] = getattr(pymysql.cursors, DB_CONFIG['cursorclass'].split('.')[-1])
 
 def save_to_database(push_data):
     """
@@ -57,11 +77,11 @@ def save_to_database(push_data):
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
             """
             cursor.execute(create_table_query)
-            
+
             # 插入数据
             insert_query = """
             INSERT INTO daily_pushes (
-                push_date, push_time, weather_info, ai_advice, 
+                push_date, push_time, weather_info, ai_advice,
                 history_events, hot_searches, daily_image, status
             ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             ON DUPLICATE KEY UPDATE
@@ -74,7 +94,7 @@ def save_to_database(push_data):
                 status = VALUES(status),
                 updated_at = CURRENT_TIMESTAMP
             """
-            
+
             cursor.execute(insert_query, (
                 push_data['push_date'],
                 push_data['push_time'],
@@ -85,11 +105,11 @@ def save_to_database(push_data):
                 push_data['daily_image'],
                 push_data['status']
             ))
-        
+
         # 提交事务
         conn.commit()
         print(f"\n数据库操作成功: 保存了{push_data['push_date']}的推送数据")
-        
+
     except pymysql.MySQLError as e:
         print(f"\n数据库错误: {e}")
         if hasattr(e, 'args') and len(e.args) > 1:
@@ -113,132 +133,129 @@ ai_url = API_URLS['ai_url']
 ai_api_key = API_KEYS['ai_api_key']
 image_url = API_URLS['image_url']
 
-# 记录开始时间
-start_time = datetime.datetime.now()
-print(f"\n===== 程序开始执行: {start_time.strftime('%Y-%m-%d %H:%M:%S')} =====")
-
-# 初始化数据变量，设置默认值
-weather_info = get_default_weather_info()
-weather_info_json = json.dumps(weather_info, ensure_ascii=False)
-history_events = get_default_history_events()
-hot_searches = get_default_hot_searches()
-daily_image = None
-weather_advice = get_default_ai_advice()
-all_services_status = {
-    'weather': 'failed',
-    'history': 'failed', 
-    'hot_searches': 'failed',
-    'image': 'failed',
-    'ai': 'failed'
-}
+def fetch_weather():
+    """
+    获取天气信息，成功返回天气数据，失败返回None
+    """
+    try:
+        print("正在获取天气信息...")
+        weather_response = requests.get(weather_url, timeout=10)
+        print(f"天气接口状态码: {weather_response.status_code}")
 
-# 1. 获取天气信息（独立错误处理）
-try:
-    print("正在获取天气信息...")
-    weather_response = requests.get(weather_url, timeout=10)
-    print(f"天气接口状态码: {weather_response.status_code}")
-
-    if DEBUG:
-        print(f"天气接口原始响应: {weather_response.text}")
-
-    weather_data = weather_response.json()
-    print(f"天气数据解析成功，包含字段: {list(weather_data.keys())}")
-
-    if weather_data.get("code") == 1 and 'data' in weather_data:
-        weather_info = weather_data['data']
-        weather_info_json = json.dumps(weather_info, ensure_ascii=False)
-        all_services_status['weather'] = 'success'
-        print("\n天气信息提取成功:")
-        for key, value in weather_info.items():
-            print(f"  {key}: {value}")
-    else:
+        if DEBUG:
+            print(f"天气接口原始响应: {weather_response.text}")
+
+        weather_data = weather_response.json()
+        print(f"天气数据解析成功，包含字段: {list(weather_data.keys())}")
+
+        if weather_data.get("code") == 1 and 'data' in weather_data:
+            weather_info = WeatherInfo.from_api(weather_data['data'])
+            print("\n天气信息提取成功:")
+            for key, value in weather_data['data'].items():
+                print(f"  {key}: {value}")
+            return weather_info
         print(f"\n天气信息获取失败: {weather_data.get('message', '未知错误')}")
-except Exception as e:
-    print(f"\n天气信息获取异常: {str(e)}")
-    # 使用默认天气信息
-    print("使用默认天气信息")
+    except Exception as e:
+        print(f"\n天气信息获取异常: {str(e)}")
+        # 使用默认天气信息
+        print("使用默认天气信息")
+    return None
 
-# 2. 获取历史上的今天（独立错误处理）
-try:
-    print("\n正在获取历史上的今天...")
-    history_response = requests.get(history_url, timeout=10)
-    print(f"历史接口状态码: {history_response.status_code}")
+def fetch_history():
+    """
+    获取历史上的今天，成功返回事件列表，失败返回None
+    """
+    try:
+        print("\n正在获取历史上的今天...")
+        history_response = requests.get(history_url, timeout=10)
+        print(f"历史接口状态码: {history_response.status_code}")
 
-    if DEBUG:
-        print(f"历史接口原始响应: {history_response.text}")
+        if DEBUG:
+            print(f"历史接口原始响应: {history_response.text}")
 
-    history_data = history_response.json()
-    print(f"历史数据解析成功，包含字段: {list(history_data.keys())}")
+        history_data = history_response.json()
+        print(f"历史数据解析成功，包含字段: {list(history_data.keys())}")
 
-    if "data" in history_data and isinstance(history_data['data'], list):
-        history_events = history_data['data']
-        all_services_status['history'] = 'success'
-        print(f"成功获取 {len(history_events)} 条历史事件")
-    else:
+        if "data" in history_data and isinstance(history_data['data'], list):
+            history_events = tuple(HistoryEvent.from_api(e) for e in history_data['data'])
+            print(f"成功获取 {len(history_events)} 条历史事件")
+            return history_events
         print("\n历史上的今天获取失败")
-except Exception as e:
-    print(f"\n历史数据获取异常: {str(e)}")
-    # 使用默认历史事件
-    print("使用默认历史事件")
-
-# 3. 获取微博热搜（独立错误处理）
-try:
-    print("\n正在获取微博热搜...")
-    weibohot_response = requests.get(weibohot_url, timeout=10)
-    print(f"微博热搜接口状态码: {weibohot_response.status_code}")
-
-    if DEBUG:
-        print(f"微博热搜接口原始响应: {weibohot_response.text}")
-
-    weibohot_data = weibohot_response.json()
-    print(f"微博热搜数据解析成功，包含字段: {list(weibohot_data.keys())}")
-
-    if "data" in weibohot_data and isinstance(weibohot_data['data'], list):
-        hot_searches = weibohot_data['data'][:10]  # 只取前10条
-        all_services_status['hot_searches'] = 'success'
-        print(f"成功获取 {len(hot_searches)} 条微博热搜")
-        if DEBUG and hot_searches:
-            print(f"前5条热搜示例: {hot_searches[:5]}")
-    else:
-        print("\n微博热搜获取失败")
-except Exception as e:
-    print(f"\n微博热搜获取异常: {str(e)}")
-    # 使用默认热搜
-    print("使用默认热搜数据")
+    except Exception as e:
+        print(f"\n历史数据获取异常: {str(e)}")
+        # 使用默认历史事件
+        print("使用默认历史事件")
+    return None
 
-# 4. 获取每日一图（独立错误处理）
-try:
-    print("\n正在获取每日一图...")
-    # 添加请求头以避免403错误
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    image_response = requests.get(image_url, headers=headers, timeout=10)
-    print(f"图片接口状态码: {image_response.status_code}")
+def fetch_hot_searches():
+    """
+    获取微博热搜，成功返回前10条热搜，失败返回None
+    """
+    try:
+        print("\n正在获取微博热搜...")
+        weibohot_response = requests.get(weibohot_url, timeout=10)
+        print(f"微博热搜接口状态码: {weibohot_response.status_code}")
 
-    if image_response.status_code == 200:
-        # 解析JSON响应
-        image_data = image_response.json()
         if DEBUG:
-            print(f"图片数据解析成功，包含字段: {list(image_data.keys())}")
-        
-        # 从JSON中提取图片链接
-        daily_image = image_data.get('image_links')
-        if daily_image:
-            all_services_status['image'] = 'success'
-            print(f"成功获取每日图片URL: {daily_image}")
-        else:
+            print(f"微博热搜接口原始响应: {weibohot_response.text}")
+
+        weibohot_data = weibohot_response.json()
+        print(f"微博热搜数据解析成功，包含字段: {list(weibohot_data.keys())}")
+
+        if "data" in weibohot_data and isinstance(weibohot_data['data'], list):
+            hot_searches = tuple(HotSearchItem.from_api(h) for h in weibohot_data['data'][:10])  # 只取前10条
+            print(f"成功获取 {len(hot_searches)} 条微博热搜")
+            if DEBUG and hot_searches:
+                print(f"前5条热搜示例: {hot_searches[:5]}")
+            return hot_searches
+        print("\n微博热搜获取失败")
+    except Exception as e:
+        print(f"\n微博热搜获取异常: {str(e)}")
+        # 使用默认热搜
+        print("使用默认热搜数据")
+    return None
+
+def fetch_daily_image():
+    """
+    获取每日一图，成功返回图片URL，失败返回None
+    """
+    try:
+        print("\n正在获取每日一图...")
+        # 添加请求头以避免403错误
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        image_response = requests.get(image_url, headers=headers, timeout=10)
+        print(f"图片接口状态码: {image_response.status_code}")
+
+        if image_response.status_code == 200:
+            # 解析JSON响应
+            image_data = image_response.json()
+            if DEBUG:
+                print(f"图片数据解析成功，包含字段: {list(image_data.keys())}")
+
+            # 从JSON中提取图片链接
+            daily_image = image_data.get('image_links')
+            if daily_image:
+                print(f"成功获取每日图片URL: {daily_image}")
+                return daily_image
             print("\n图片数据中未找到有效图片链接")
-    else:
-        print("\n每日一图获取失败")
-except Exception as e:
-    print(f"\n每日一图获取异常: {str(e)}")
-    # 保持daily_image为None
+        else:
+            print("\n每日一图获取失败")
+    except Exception as e:
+        print(f"\n每日一图获取异常: {str(e)}")
+    return None
+
+def generate_weather_advice(weather_info):
+    """
+    调用AI生成天气建议，成功返回建议文本，失败返回None
+    """
+    try:
+        # 只有在天气数据获取成功时才调用AI
+        if weather_info is None:
+            print("\n天气数据获取失败，跳过AI建议生成")
+            return None
 
-# 5. 调用AI生成天气建议（独立错误处理）
-try:
-    # 只有在天气数据获取成功时才调用AI
-    if all_services_status['weather'] == 'success':
         print("\n正在生成天气建议...")
         print(f"AI请求URL: {ai_url}")
 
@@ -252,7 +269,7 @@ try:
                         "请使用动漫《魔女之旅》中伊蕾娜的语气——优雅、自信、略带傲娇、偶尔可爱，"
                         "像在对旅客轻松说话一样。可以加入少量可爱的颜文字，例如 (⌒‿⌒)・(〃´-`〃)・(*´ω`*)・(>ω<)。"
                         "内容包括：是否适合外出活动、天气状况点评、穿衣提醒。"
-                        f"天气数据：{json.dumps(weather_info, ensure_ascii=False)}"
+                        f"天气数据：{weather_info.to_json()}"
                     )
                 }
             ]
@@ -277,92 +294,92 @@ try:
 
         if "choices" in ai_result and ai_result["choices"]:
             weather_advice = ai_result["choices"][0]["message"]["content"]
-            all_services_status['ai'] = 'success'
             print(f"\nAI天气建议生成成功:")
             print(f"{weather_advice}")
-        else:
-            print("\nAI响应格式异常，无法提取内容")
-            weather_advice = get_default_ai_advice()
-    else:
-        print("\n天气数据获取失败，跳过AI建议生成")
-except Exception as e:
-    print(f"\nAI建议生成异常: {str(e)}")
-    # 使用默认天气建议
-    print("使用默认天气建议")
-
-# 准备要存储的数据
-push_data = {
-    'push_date': datetime.datetime.now().strftime('%Y-%m-%d'),
-    'push_time': datetime.datetime.now().strftime('%H:%M:%S'),
-    'weather_info': weather_info_json,
-    'ai_advice': weather_advice,
-    'history_events': json.dumps(history_events, ensure_ascii=False),
-    'hot_searches': json.dumps(hot_searches, ensure_ascii=False),
-    'daily_image': daily_image,
-    'status': 'pending'  # 初始状态
-}
+            return weather_advice
+        print("\nAI响应格式异常，无法提取内容")
+    except Exception as e:
+        print(f"\nAI建议生成异常: {str(e)}")
+        # 使用默认天气建议
+        print("使用默认天气建议")
+    return None
+
+# 提示框样式，用于各区块的数据缺失提示
+NOTE_STYLE = "margin-bottom: 10px; padding: 8px; background-color: #fff3cd; border: 1px solid #ffeaa7; border-radius: 4px; color: #856404;"
+
+def render_note(status, failed_text, pending_text):
+    """
+    根据服务状态生成提示框，成功时返回空字符串
+    """
+    if status == 'success':
+        return ""
+    text = pending_text if status == 'pending' else failed_text
+    note = f"            <div style='{NOTE_STYLE}'>\n"
+    note += f"                <strong>⚠️ 提示：</strong>{text}\n"
+    note += "            </div>\n"
+    return note
+
+def render_weather_section(weather_info, weather_advice, weather_status, ai_status):
+    """
+    生成天气区块（含AI天气建议）
+    """
+    weather_status_note = render_note(weather_status, '天气数据获取失败，以下为默认信息',
+                                      '天气数据仍在获取中，以下为默认信息')
 
-print("\n各服务状态汇总:")
-for service, status in all_services_status.items():
-    print(f"  {service}: {'✓ 成功' if status == 'success' else '✗ 失败'}")
-    
-    # 构建结构化的天气内容
-    # 根据天气服务状态添加提示信息
-    weather_status_note = """
-            <div style="margin-bottom: 10px; padding: 8px; background-color: #fff3cd; border: 1px solid #ffeaa7; border-radius: 4px; color: #856404;">
-                <strong>⚠️ 提示：</strong>天气数据获取失败，以下为默认信息
-            </div>
-    """ if all_services_status['weather'] != 'success' else ""
-    
     # 为天气建议添加状态提示
-    ai_status_note = """
-                <span style="color: #856404; font-size: 0.9em; margin-left: 10px;">(数据缺失，默认建议)</span>
-    """ if all_services_status['ai'] != 'success' else ""
-    
-    weather_html = f"""
+    if ai_status == 'success':
+        ai_status_note = ""
+    else:
+        ai_text = f'(生成中，{PENDING_HINT})' if ai_status == 'pending' else '(数据缺失，默认建议)'
+        ai_status_note = f"""
+                <span style="color: #856404; font-size: 0.9em; margin-left: 10px;">{ai_text}</span>
+    """
+
+    return f"""
+        <div class="weather-section">
             <h2>🌤️ 今日天气</h2>
-            {weather_status_note}
+{weather_status_note}
             <div style="margin-left: 20px; background-color: #f8f9fa; padding: 15px; border-radius: 8px; border: 1px solid #e9ecef;">
                 <table style="width: 100%; border-collapse: collapse;">
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">城市：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('city', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.city}</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">日期：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('date', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.date}</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">星期：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('day', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.day}</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">天气状况：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('weather', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.weather}</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">温度：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('temp', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.temp}</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">体感温度：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('feelsLike', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.feels_like}</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">最高气温：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('highTemp', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.high_temp}</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">最低气温：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('lowTemp', '未知')}℃</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.low_temp}℃</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">相对湿度：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('rh', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.rh}</td>
                     </tr>
                     <tr style="border-bottom: 1px solid #dee2e6;">
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">风力风向：</td>
-                        <td style="padding: 8px 0; color: #212529;">{weather_info.get('wind', '未知')}</td>
+                        <td style="padding: 8px 0; color: #212529;">{weather_info.wind}</td>
                     </tr>
                     <tr>
                         <td style="padding: 8px 0; width: 30%; font-weight: bold; color: #495057;">💡 天气建议：</td>
@@ -370,16 +387,148 @@ for service, status in all_services_status.items():
                     </tr>
                 </table>
             </div>
+        </div>
 """
 
-    # 生成HTML格式的内容
-    final_content = '''
+def render_history_section(history_events, status):
+    """
+    生成历史上的今天区块
+    """
+    content = '''
+        <div class="history-section">
+            <h2>📜 历史上的今天</h2>
+            <ul>
+'''
+
+    # 根据历史服务状态添加提示信息
+    content += render_note(status, '历史数据获取失败', f'历史数据仍在获取中，{PENDING_HINT}')
+
+    # 使用卡片式设计显示历史事件
+    content += "            <div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; border: 1px solid #e9ecef;'>\n"
+
+    if history_events:
+        for event in history_events:
+            content += "                <div style='padding: 10px; margin-bottom: 8px; background-color: white; border-radius: 6px; border-left: 4px solid #007bff; box-shadow: 0 1px 3px rgba(0,0,0,0.05);'>\n"
+            content += f"                    {event.text}\n"
+            content += "                </div>\n"
+    else:
+        content += "                <div style='padding: 20px; text-align: center; color: #6c757d;'>\n"
+        content += "                    暂无历史事件数据\n"
+        content += "                </div>\n"
+
+    content += "            </div>\n"
+    content += '''
+            </ul>
+        </div>
+'''
+    return content
+
+def render_hot_section(hot_searches, status):
+    """
+    生成微博热搜区块
+    """
+    content = '''
+        <div class="hot-section">
+            <h2>🔥 微博热搜</h2>
+'''
+
+    # 根据热搜服务状态添加提示信息
+    content += render_note(status, '热搜数据获取失败', f'热搜数据仍在获取中，{PENDING_HINT}')
+
+    # 使用统一的div结构替代class样式，确保在各种邮件客户端中显示一致
+    content += "            <div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; border: 1px solid #e9ecef;'>\n"
+
+    if hot_searches:
+        for i, hot in enumerate(hot_searches, 1):
+            # 设置排名背景色
+            rank_color = '#ff4757' if i <= 3 else '#ff6b81'
+
+            content += "                <div style='display: flex; align-items: center; padding: 12px; margin-bottom: 8px; background-color: white; border-radius: 6px; box-shadow: 0 1px 3px rgba(0,0,0,0.05);'>\n"
+            content += f"                    <div style='width: 24px; height: 24px; line-height: 24px; text-align: center; background-color: {rank_color}; color: white; border-radius: 4px; margin-right: 10px; font-weight: bold; font-size: 14px;'>{i}</div>\n"
+
+            content += f"                    <div style='flex: 1; color: #212529; font-size: 14px; line-height: 1.5;'>{hot.title}</div>\n"
+            if hot.hot:
+                content += f"                    <div style='color: #6c757d; font-size: 12px; margin-left: 10px;'>{hot.hot}</div>\n"
+
+            content += "                </div>\n"
+    else:
+        content += "                <div style='padding: 20px; text-align: center; color: #6c757d;'>\n"
+        content += "                    暂无热搜数据\n"
+        content += "                </div>\n"
+
+    content += "            </div>\n"
+    content += '''
+        </div>
+'''
+    return content
+
+def render_image_section(daily_image, status):
+    """
+    生成每日一图区块
+    """
+    content = '''
+        <div style="margin-top: 30px;">
+            <h2>🖼️ 每日一图</h2>
+            <div style="text-align: center; padding: 20px; background-color: #f8f9fa; border-radius: 8px; border: 1px solid #e9ecef;">
+'''
+
+    # 根据图片服务状态添加内容
+    if daily_image:
+        content += f"                <img src=\"{daily_image}\" alt=\"每日一图\" style=\"max-width: 100%; height: auto; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); border: 3px solid white;\">\n"
+    else:
+        image_text = f'图片获取中，{PENDING_HINT}' if status == 'pending' else '图片获取失败 '
+        content += "                <div style='padding: 50px 20px; background-color: white; border: 1px dashed #dee2e6; border-radius: 8px; display: inline-block;'>\n"
+        content += f"                    <p style='color: #6c757d; font-size: 18px; margin: 0;'>{image_text}</p>\n"
+        content += "                    <p style='color: #adb5bd; font-size: 14px; margin: 5px 0 0;'>(┬＿┬)</p>\n"
+        content += "                </div>\n"
+
+    content += '''            </div>
+        </div>'''
+    return content
+
+def render_footer(services_status):
+    """
+    生成页脚，包含数据缺失及延迟补发提示
+    """
+    service_status_text = "\n"
+    failed_services = [s for s, status in services_status.items() if status == 'failed']
+    pending_services = [s for s, status in services_status.items() if status == 'pending']
+
+    if failed_services or pending_services:
+        service_status_text += "            <p style='margin: 10px 0; color: #856404; font-size: 13px;'>\n"
+        service_status_text += "                <strong>⚠️ 今日数据状态提示：</strong>\n"
+        if failed_services:
+            failed_texts = [SERVICE_NAMES.get(s, s) for s in failed_services]
+            service_status_text += f"                以下服务暂时不可用：{', '.join(failed_texts)}\n"
+        if pending_services:
+            pending_texts = [SERVICE_NAMES.get(s, s) for s in pending_services]
+            service_status_text += f"                以下内容仍在获取中：{', '.join(pending_texts)}\n"
+        service_status_text += "                数据将在系统恢复后自动补充，感谢您的理解！\n"
+        service_status_text += "            </p>\n"
+
+    footer = '''
+        <div style="margin-top: 40px; padding: 20px; background-color: #f8f9fa; border-top: 1px solid #dee2e6; border-radius: 8px; text-align: center; color: #6c757d; font-size: 14px;">
+            <p>✨ 伊蕾娜的每日播报 ✨</p>
+            <p>数据更新时间：'''
+    footer += datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    footer += '''</p>'''
+    footer += service_status_text
+    footer += '''
+            <p style="margin-top: 15px; font-size: 12px; color: #adb5bd;">若您发现内容有误或有建议，请随时反馈</p>
+        </div>'''
+    return footer
+
+def render_document(title, body):
+    """
+    将各区块内容包装为完整的HTML文档
+    """
+    document = '''
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>伊蕾娜的每日播报</title>
+    <title>''' + title + '''</title>
     <style>
         body {
             font-family: 'Microsoft YaHei', Arial, sans-serif;
@@ -514,202 +663,249 @@ for service, status in all_services_status.items():
 </head>
 <body>
     <div class="container">
-        <h1>伊蕾娜的每日播报</h1>
-        
-        <div class="weather-section">
+        <h1>''' + title + '''</h1>
 '''
+    document += body
+    document += '''
+    </div>
+</body>
+</html>'''
+    return document
 
-    # 添加结构化的天气内容
-    final_content += weather_html
+def render_report(report, services_status):
+    """
+    生成完整的每日播报HTML
+    """
+    body = render_weather_section(report.weather_info, report.ai_advice,
+                                  services_status['weather'], services_status['ai'])
+    body += render_history_section(report.history_events, services_status['history'])
+    body += render_hot_section(report.hot_searches, services_status['hot_searches'])
+    body += render_image_section(report.daily_image, services_status['image'])
+    body += render_footer(services_status)
+    return render_document("伊蕾娜的每日播报", body)
+
+def render_followup(report, services_status, late_services):
+    """
+    生成补充推送HTML，只包含截止时间之后才到达的区块
+    """
+    body = ""
+    if 'weather' in late_services or 'ai' in late_services:
+        body += render_weather_section(report.weather_info, report.ai_advice,
+                                       services_status['weather'], services_status['ai'])
+    if 'history' in late_services:
+        body += render_history_section(report.history_events, services_status['history'])
+    if 'hot_searches' in late_services:
+        body += render_hot_section(report.hot_searches, services_status['hot_searches'])
+    if 'image' in late_services:
+        body += render_image_section(report.daily_image, services_status['image'])
+    body += render_footer(services_status)
+    return render_document("伊蕾娜的每日播报（补充）", body)
+
+def send_to_pushplus(title, content):
+    """
+    发送消息到pushplus，返回 'success' 或 'failed'
+    """
+    try:
+        print("\n正在发送到pushplus...")
+        message_payload = {
+            "token": API_KEYS['pushplus_token'],
+            "title": title,
+            "content": content,
+            "channel": "mail"
+        }
 
-    final_content += '''
-        </div>
-        
-        <div class="history-section">
-            <h2>📜 历史上的今天</h2>
-            <ul>
-'''
+        if DEBUG:
+            print(f"pushplus请求payload: {json.dumps(message_payload, ensure_ascii=False)[:500]}...")
+
+        message_response = requests.post(message_url, json=message_payload, timeout=30)
+        print(f"pushplus接口状态码: {message_response.status_code}")
+        print(f"pushplus响应: {message_response.text}")
+
+        if message_response.headers.get('content-type') == 'application/json':
+            push_result = message_response.json()
+            print(f"pushplus响应解析成功，包含字段: {list(push_result.keys())}")
+            if push_result.get("code") == 200:
+                print("\n任务完成！")
+                return 'success'
+            print(f"\npushplus发送失败: {push_result.get('msg', '未知错误')}")
+        else:
+            print("\npushplus响应格式异常")
+    except Exception as e:
+        print(f"\n推送消息异常: {str(e)}")
+    return 'failed'
+
+# 各服务对应的 DailyReport 字段
+SERVICE_FIELDS = {
+    'weather': 'weather_info',
+    'history': 'history_events',
+    'hot_searches': 'hot_searches',
+    'image': 'daily_image',
+    'ai': 'ai_advice'
+}
 
-    # 添加历史上的今天内容
-    # 根据历史服务状态添加提示信息
-    if all_services_status['history'] != 'success':
-        final_content += "            <div style='margin-bottom: 10px; padding: 8px; background-color: #fff3cd; border: 1px solid #ffeaa7; border-radius: 4px; color: #856404;'>\n"
-        final_content += "                <strong>⚠️ 提示：</strong>历史数据获取失败\n"
-        final_content += "            </div>\n"
-    
-    # 使用卡片式设计显示历史事件
-    final_content += "            <div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; border: 1px solid #e9ecef;'>\n"
-    
-    if history_events:
-        for event in history_events:
-            final_content += "                <div style='padding: 10px; margin-bottom: 8px; background-color: white; border-radius: 6px; border-left: 4px solid #007bff; box-shadow: 0 1px 3px rgba(0,0,0,0.05);'>\n"
-            final_content += f"                    {event}\n"
-            final_content += "                </div>\n"
+def collect_stage(report, services_status, service, future):
+    """
+    读取已完成阶段的结果，成功时写入report并更新服务状态
+    """
+    value = future.result()
+    if value is not None:
+        setattr(report, SERVICE_FIELDS[service], value)
+        services_status[service] = 'success'
     else:
-        final_content += "                <div style='padding: 20px; text-align: center; color: #6c757d;'>\n"
-        final_content += "                    暂无历史事件数据\n"
-        final_content += "                </div>\n"
-    
-    final_content += "            </div>\n"
+        services_status[service] = 'failed'
 
-    final_content += '''
-            </ul>
-        </div>
-        
-        <div class="hot-section">
-            <h2>🔥 微博热搜</h2>
-'''
+def submit_stages(executor, profiler):
+    """
+    并发获取各数据源（各自独立错误处理），AI建议等待天气数据后生成，返回 {服务名: future}
+    """
+    weather_future = executor.submit(profiler.wrap('fetch:weather', fetch_weather))
 
-    # 添加微博热搜内容
-    # 根据热搜服务状态添加提示信息
-    if all_services_status['hot_searches'] != 'success':
-        final_content += "            <div style='margin-bottom: 10px; padding: 8px; background-color: #fff3cd; border: 1px solid #ffeaa7; border-radius: 4px; color: #856404;'>\n"
-        final_content += "                <strong>⚠️ 提示：</strong>热搜数据获取失败\n"
-        final_content += "            </div>\n"
-    
-    # 使用统一的div结构替代class样式，确保在各种邮件客户端中显示一致
-    final_content += "            <div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; border: 1px solid #e9ecef;'>\n"
-    
-    if hot_searches:
-        for i, hot in enumerate(hot_searches, 1):
-            # 设置排名背景色
-            rank_color = '#ff4757' if i <= 3 else '#ff6b81'
-            
-            final_content += "                <div style='display: flex; align-items: center; padding: 12px; margin-bottom: 8px; background-color: white; border-radius: 6px; box-shadow: 0 1px 3px rgba(0,0,0,0.05);'>\n"
-            final_content += f"                    <div style='width: 24px; height: 24px; line-height: 24px; text-align: center; background-color: {rank_color}; color: white; border-radius: 4px; margin-right: 10px; font-weight: bold; font-size: 14px;'>{i}</div>\n"
-            
-            if isinstance(hot, dict):
-                title = hot.get('title', '未知标题')
-                hot_count = hot.get('hot', '')
-                final_content += f"                    <div style='flex: 1; color: #212529; font-size: 14px; line-height: 1.5;'>{title}</div>\n"
-                if hot_count:
-                    final_content += f"                    <div style='color: #6c757d; font-size: 12px; margin-left: 10px;'>{hot_count}</div>\n"
-            else:
-                final_content += f"                    <div style='flex: 1; color: #212529; font-size: 14px; line-height: 1.5;'>{hot}</div>\n"
-            
-            final_content += "                </div>\n"
-    else:
-        final_content += "                <div style='padding: 20px; text-align: center; color: #6c757d;'>\n"
-        final_content += "                    暂无热搜数据\n"
-        final_content += "                </div>\n"
-    
-    final_content += "            </div>\n"
+    def run_ai_stage():
+        weather_info = weather_future.result()
+        with profiler.stage('ai'):
+            return generate_weather_advice(weather_info)
 
-    final_content += '''
-        </div>
-        
-        <div style="margin-top: 30px;">
-            <h2>🖼️ 每日一图</h2>
-            <div style="text-align: center; padding: 20px; background-color: #f8f9fa; border-radius: 8px; border: 1px solid #e9ecef;">'''
-    
-    # 根据图片服务状态添加内容
-    if daily_image:
-        final_content += f"                <img src=\"{daily_image}\" alt=\"每日一图\" style=\"max-width: 100%; height: auto; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); border: 3px solid white;\">\n"
-    else:
-        final_content += "                <div style='padding: 50px 20px; background-color: white; border: 1px dashed #dee2e6; border-radius: 8px; display: inline-block;'>\n"
-        final_content += "                    <p style='color: #6c757d; font-size: 18px; margin: 0;'>图片获取失败 </p>\n"
-        final_content += "                    <p style='color: #adb5bd; font-size: 14px; margin: 5px 0 0;'>(┬＿┬)</p>\n"
-        final_content += "                </div>\n"
-    
-    final_content += '''            </div>
-        </div>'''
+    return {
+        'weather': weather_future,
+        'history': executor.submit(profiler.wrap('fetch:history', fetch_history)),
+        'hot_searches': executor.submit(profiler.wrap('fetch:hot_searches', fetch_hot_searches)),
+        'image': executor.submit(profiler.wrap('fetch:image', fetch_daily_image)),
+        'ai': executor.submit(run_ai_stage)
+    }
 
-    # 添加页脚信息，包含数据缺失提示
-    service_status_text = "\n"
-    failed_services = [service for service, status in all_services_status.items() if status != 'success']
-    
-    if failed_services:
-        service_status_text += "            <p style='margin: 10px 0; color: #856404; font-size: 13px;'>\n"
-        service_status_text += "                <strong>⚠️ 今日数据状态提示：</strong>\n"
-        
-        status_map = {
-            'weather': '天气数据',
-            'history': '历史事件',
-            'hot_searches': '热搜榜',
-            'image': '每日一图',
-            'ai': '天气建议'
-        }
-        
-        failed_texts = [status_map.get(s, s) for s in failed_services]
-        service_status_text += f"                以下服务暂时不可用：{', '.join(failed_texts)}\n"
-        service_status_text += "                数据将在系统恢复后自动补充，感谢您的理解！\n"
-        service_status_text += "            </p>\n"
-    
-    final_content += '''
-        <div style="margin-top: 40px; padding: 20px; background-color: #f8f9fa; border-top: 1px solid #dee2e6; border-radius: 8px; text-align: center; color: #6c757d; font-size: 14px;">
-            <p>✨ 伊蕾娜的每日播报 ✨</p>
-            <p>数据更新时间：'''
-    final_content += datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    final_content += '''</p>'''
-    final_content += service_status_text
-    final_content += '''
-            <p style="margin-top: 15px; font-size: 12px; color: #adb5bd;">若您发现内容有误或有建议，请随时反馈</p>
-        </div>
-    </div>
-</body>
-</html>'''
+def wait_for_stages(stage_futures, timeout, report):
+    """
+    最多等待 timeout 秒，已完成阶段的结果写入report，未完成的标记为 pending 并继续在后台获取，
+    返回 (各服务状态, 未完成的 {服务名: future})
+    """
+    services_status = {service: 'failed' for service in stage_futures}
+    wait(stage_futures.values(), timeout=max(timeout, 0))
+    late_futures = {}
+    for service, future in stage_futures.items():
+        if future.done():
+            collect_stage(report, services_status, service, future)
+        else:
+            services_status[service] = 'pending'
+            late_futures[service] = future
+    return services_status, late_futures
+
+def collect_late_stages(late_futures, report, services_status):
+    """
+    等待截止时间后仍在获取的内容（各请求自带超时），结果写入report，返回成功到达的服务
+    """
+    wait(late_futures.values())
+    for service, future in late_futures.items():
+        collect_stage(report, services_status, service, future)
+    return [s for s in late_futures if services_status[s] == 'success']
+
+def main():
+    # 记录开始时间
+    start_time = datetime.datetime.now()
+    print(f"\n===== 程序开始执行: {start_time.strftime('%Y-%m-%d %H:%M:%S')} =====")
+
+    # python main.py --profile 时按阶段统计耗时与调用栈采样，--profile-memory 时同时统计内存分配
+    profile_memory = '--profile-memory' in sys.argv[1:]
+    profiler = Profiler(enabled=profile_memory or '--profile' in sys.argv[1:], trace_memory=profile_memory)
+    profiler.start()
+
+    # 初始化数据变量，设置默认值
+    report = DailyReport(
+        push_date=start_time.strftime('%Y-%m-%d'),
+        weather_info=get_default_weather_info(),
+        ai_advice=get_default_ai_advice(),
+        history_events=get_default_history_events(),
+        hot_searches=get_default_hot_searches()
+    )
+
+    # 1~5. 并发获取各数据源，等待到截止时间，未完成的数据源标记为 pending
+    executor = ThreadPoolExecutor(max_workers=len(SERVICE_FIELDS))
+    stage_futures = submit_stages(executor, profiler)
+    remaining = SEND_DEADLINE - (datetime.datetime.now() - start_time).total_seconds()
+    all_services_status, late_futures = wait_for_stages(stage_futures, remaining, report)
+
+    if late_futures:
+        late_names = [SERVICE_NAMES[s] for s in late_futures]
+        print(f"\n已到达推送截止时间({SEND_DEADLINE}秒)，以下内容仍在获取中: {', '.join(late_names)}")
+
+    print("\n各服务状态汇总:")
+    for service, status in all_services_status.items():
+        print(f"  {service}: {'✓ 成功' if status == 'success' else ('… 获取中' if status == 'pending' else '✗ 失败')}")
+
+    # 生成HTML格式的内容
+    with profiler.stage('render'):
+        final_content = render_report(report, all_services_status)
 
     print("\n正在构建HTML内容...")
     print(f"HTML内容长度: {len(final_content)} 字符")
     print(
         f"内容包含: 天气信息{'(默认)' if all_services_status['weather'] != 'success' else ''}、"
-        f"{len(history_events)}条历史事件{'(默认)' if all_services_status['history'] != 'success' else ''}、"
-        f"{len(hot_searches)}条热搜{'(默认)' if all_services_status['hot_searches'] != 'success' else ''}、"
-        f"{'图片' if daily_image else '无图片'}")
-
-# 发送消息到pushplus（独立错误处理）
-try:
-    print("\n正在发送到pushplus...")
-    message_payload = {
-        "token": API_KEYS['pushplus_token'],
-        "title": "伊蕾娜的每日播报",
-        "content": final_content,
-        "channel": "mail"
-    }
-
-    if DEBUG:
-        print(f"pushplus请求payload: {json.dumps(message_payload, ensure_ascii=False)[:500]}...")
-
-    message_response = requests.post(message_url, json=message_payload, timeout=30)
-    print(f"pushplus接口状态码: {message_response.status_code}")
-    print(f"pushplus响应: {message_response.text}")
-
-    if message_response.headers.get('content-type') == 'application/json':
-        push_result = message_response.json()
-        print(f"pushplus响应解析成功，包含字段: {list(push_result.keys())}")
-        if push_result.get("code") == 200:
-            print("\n任务完成！")
-            push_data['status'] = 'success'
-        else:
-            print(f"\npushplus发送失败: {push_result.get('msg', '未知错误')}")
-            push_data['status'] = 'failed'
-    else:
-        print("\npushplus响应格式异常")
-        push_data['status'] = 'failed'
-except Exception as e:
-    print(f"\n推送消息异常: {str(e)}")
-    push_data['status'] = 'failed'
-
-# 无论推送结果如何，都保存数据到数据库
-try:
-    save_to_database(push_data)
-    print(f"\n数据已成功保存到数据库！状态: {push_data['status']}")
-except Exception as db_error:
-    print(f"\n数据库保存失败: {db_error}")
-
-# 计算总执行时间并结束
-end_time = datetime.datetime.now()
-total_time = end_time - start_time
-print(f"\n===== 程序执行完毕: {end_time.strftime('%Y-%m-%d %H:%M:%S')} =====")
-print(f"总执行时间: {total_time.total_seconds():.2f} 秒")
-
-# 输出服务状态汇总
-print("\n===== 服务状态汇总 =====")
-success_count = sum(1 for status in all_services_status.values() if status == 'success')
-failed_count = len(all_services_status) - success_count
-print(f"成功服务数: {success_count}/{len(all_services_status)}")
-print(f"失败服务数: {failed_count}/{len(all_services_status)}")
-for service, status in all_services_status.items():
-    print(f"  {service}: {'✓ 成功' if status == 'success' else '✗ 失败'}")
-print("\n推送状态: {'✓ 成功' if push_data['status'] == 'success' else '✗ 失败'}")
-print("==================================================")
+        f"{len(report.history_events)}条历史事件{'(默认)' if all_services_status['history'] != 'success' else ''}、"
+        f"{len(report.hot_searches)}条热搜{'(默认)' if all_services_status['hot_searches'] != 'success' else ''}、"
+        f"{'图片' if report.daily_image else '无图片'}")
+
+    # 发送消息到pushplus（独立错误处理）
+    with profiler.stage('deliver'):
+        push_status = send_to_pushplus("伊蕾娜的每日播报", final_content)
+
+    # 准备要存储的数据，无论推送结果如何，都保存数据到数据库
+    with profiler.stage('persist'):
+        push_data = report.to_record(datetime.datetime.now().strftime('%H:%M:%S'), push_status)
+        try:
+            save_to_database(push_data)
+            print(f"\n数据已成功保存到数据库！状态: {push_data['status']}")
+        except Exception as db_error:
+            print(f"\n数据库保存失败: {db_error}")
+
+    # 延迟内容到达后更新数据库并补发
+    if late_futures:
+        print("\n正在等待延迟内容...")
+        late_arrived = collect_late_stages(late_futures, report, all_services_status)
+        print(f"延迟到达的内容: {', '.join(SERVICE_NAMES[s] for s in late_arrived) or '无'}")
+
+        if late_arrived:
+            with profiler.stage('persist'):
+                push_data = report.to_record(datetime.datetime.now().strftime('%H:%M:%S'), push_status)
+                try:
+                    save_to_database(push_data)
+                    print("\n延迟内容已更新到数据库")
+                except Exception as db_error:
+                    print(f"\n延迟内容保存失败: {db_error}")
+
+            if LATE_FOLLOWUP:
+                with profiler.stage('render'):
+                    followup_content = render_followup(report, all_services_status, late_arrived)
+                with profiler.stage('deliver'):
+                    followup_status = send_to_pushplus("伊蕾娜的每日播报（补充）", followup_content)
+                print(f"补充推送状态: {'✓ 成功' if followup_status == 'success' else '✗ 失败'}")
+    executor.shutdown()
+
+    # 将超出保留期的数据归档到本地压缩文件，保持 daily_pushes 表精简
+    if ARCHIVE_ENABLED:
+        with profiler.stage('persist'):
+            try:
+                archive_expired_pushes()
+            except Exception as archive_error:
+                print(f"\n数据归档失败: {archive_error}")
+
+    profiler.stop()
+    profiler.write()
+
+    # 计算总执行时间并结束
+    end_time = datetime.datetime.now()
+    total_time = end_time - start_time
+    print(f"\n===== 程序执行完毕: {end_time.strftime('%Y-%m-%d %H:%M:%S')} =====")
+    print(f"总执行时间: {total_time.total_seconds():.2f} 秒")
+
+    # 输出服务状态汇总
+    print("\n===== 服务状态汇总 =====")
+    success_count = sum(1 for status in all_services_status.values() if status == 'success')
+    failed_count = len(all_services_status) - success_count
+    print(f"成功服务数: {success_count}/{len(all_services_status)}")
+    print(f"失败服务数: {failed_count}/{len(all_services_status)}")
+    for service, status in all_services_status.items():
+        print(f"  {service}: {'✓ 成功' if status == 'success' else '✗ 失败'}")
+    print("\n推送状态: {'✓ 成功' if push_data['status'] == 'success' else '✗ 失败'}")
+    print("==================================================")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+import json
+
+# 缺失字段的统一占位值
+UNKNOWN = '未知'
+
+# 接口数据中没有该字段（与值为 None 区分，序列化时不输出）
+_MISSING = object()
+# 热搜条目为纯字符串（而不是字典）
+_PLAIN = object()
+
+
+def _text(value, default=UNKNOWN):
+    """
+    将接口返回的字段规范为字符串，缺失、None 或空字符串使用默认值
+    """
+    if value is _MISSING or value is None or value == '':
+        return default
+    return str(value)
+
+
+def _pack_extra(data, known_keys):
+    """
+    将未知字段压缩为 (键, 值, 键, 值, ...) 元组，没有未知字段时返回 None
+    """
+    extra = tuple(item for key, value in data.items() if key not in known_keys for item in (key, value))
+    return extra or None
+
+
+def _unpack_extra(extra):
+    return zip(extra[::2], extra[1::2]) if extra else ()
+
+
+def _display(slot, default=UNKNOWN):
+    """
+    渲染用的只读属性：返回规范为字符串的字段值
+    """
+    return property(lambda self: _text(getattr(self, slot), default))
+
+
+class WeatherInfo:
+    """
+    天气信息
+
+    已知字段按接口原始类型保存在各个 slot 中，其他字段保存在 extra 中，
+    to_dict / to_json 还原为接口返回的 data；渲染使用规范为字符串的同名属性。
+    """
+    # 属性名与接口字段名的对应关系
+    FIELDS = (
+        ('city', 'city'),
+        ('date', 'date'),
+        ('day', 'day'),
+        ('weather', 'weather'),
+        ('temp', 'temp'),
+        ('feels_like', 'feelsLike'),
+        ('high_temp', 'highTemp'),
+        ('low_temp', 'lowTemp'),
+        ('rh', 'rh'),
+        ('wind', 'wind'),
+    )
+    KEYS = frozenset(key for _, key in FIELDS)
+    __slots__ = tuple('_' + attr for attr, _ in FIELDS) + ('_extra',)
+
+    city = _display('_city')
+    date = _display('_date')
+    day = _display('_day')
+    weather = _display('_weather')
+    temp = _display('_temp')
+    feels_like = _display('_feels_like')
+    high_temp = _display('_high_temp')
+    low_temp = _display('_low_temp')
+    rh = _display('_rh')
+    wind = _display('_wind')
+
+    def __init__(self, city=UNKNOWN, date=UNKNOWN, day=UNKNOWN, weather=UNKNOWN, temp=UNKNOWN,
+                 feels_like=UNKNOWN, high_temp=UNKNOWN, low_temp=UNKNOWN, rh=UNKNOWN, wind=UNKNOWN,
+                 extra=None):
+        self._city = city
+        self._date = date
+        self._day = day
+        self._weather = weather
+        self._temp = temp
+        self._feels_like = feels_like
+        self._high_temp = high_temp
+        self._low_temp = low_temp
+        self._rh = rh
+        self._wind = wind
+        self._extra = extra
+
+    @classmethod
+    def from_api(cls, data):
+        """
+        从天气接口的 data 字段解析，格式不正确时抛出 ValueError
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"天气数据格式错误: {type(data).__name__}")
+        fields = {attr: data.get(key, _MISSING) for attr, key in cls.FIELDS}
+        return cls(extra=_pack_extra(data, cls.KEYS), **fields)
+
+    def to_dict(self):
+        """
+        还原为接口格式的字典（保留原始类型和未知字段）
+        """
+        data = {}
+        for attr, key in self.FIELDS:
+            value = getattr(self, '_' + attr)
+            if value is not _MISSING:
+                data[key] = value
+        data.update(_unpack_extra(self._extra))
+        return data
+
+    def to_json(self):
+        """
+        序列化为JSON字符串，供AI提示词和数据库使用
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def __repr__(self):
+        return f"WeatherInfo({self.to_dict()!r})"
+
+
+class HistoryEvent(str):
+    """
+    历史上的今天中的一条事件，本身即为事件文本（不额外占用内存）
+    """
+    __slots__ = ()
+
+    @property
+    def text(self):
+        return str(self)
+
+    @classmethod
+    def from_api(cls, item):
+        # 接口通常返回字符串，兼容返回字典的情况
+        if isinstance(item, dict):
+            return _DictHistoryEvent(item)
+        return cls(_text(item, ''))
+
+    def to_raw(self):
+        """
+        还原为接口返回的原始数据
+        """
+        return str(self)
+
+    def __repr__(self):
+        return f"HistoryEvent({str(self)!r})"
+
+
+class _DictHistoryEvent(HistoryEvent):
+    """
+    接口以字典返回的事件：文本为 title / event 字段，同时保留原始字典用于存库
+    """
+
+    def __new__(cls, item):
+        event = super().__new__(cls, _text(item.get('title') or item.get('event'), ''))
+        event.raw = item
+        return event
+
+    def to_raw(self):
+        return self.raw
+
+
+class HotSearchItem:
+    """
+    微博热搜中的一条
+
+    title / hot 为渲染用的字符串（热度为空或为0时为空字符串），
+    原始值和其他字段保存在 slot 中，to_raw 还原为接口返回的条目。
+    """
+    KEYS = frozenset(('title', 'hot'))
+    __slots__ = ('_title', '_hot', '_extra')
+
+    title = _display('_title', '未知标题')
+
+    def __init__(self, title, hot='', extra=None):
+        self._title = title
+        self._hot = hot
+        self._extra = extra
+
+    @property
+    def hot(self):
+        if self._hot is _MISSING or self._extra is _PLAIN or not self._hot:
+            return ''
+        return str(self._hot)
+
+    @classmethod
+    def from_api(cls, item):
+        # 兼容接口直接返回标题字符串的情况
+        if isinstance(item, dict):
+            return cls(item.get('title', _MISSING), item.get('hot', _MISSING), _pack_extra(item, cls.KEYS))
+        return cls(item, extra=_PLAIN)
+
+    def to_raw(self):
+        """
+        还原为接口返回的原始数据
+        """
+        if self._extra is _PLAIN:
+            return self._title
+        data = {}
+        if self._title is not _MISSING:
+            data['title'] = self._title
+        if self._hot is not _MISSING:
+            data['hot'] = self._hot
+        data.update(_unpack_extra(self._extra))
+        return data
+
+    def __repr__(self):
+        return f"HotSearchItem({self.title!r}, {self.hot!r})"
+
+
+class DailyReport:
+    """
+    一天的播报数据，字段名与 daily_pushes 表的列名一致
+    """
+    __slots__ = ('push_date', 'weather_info', 'ai_advice', 'history_events', 'hot_searches', 'daily_image')
+
+    def __init__(self, push_date, weather_info, ai_advice, history_events, hot_searches, daily_image=None):
+        if not isinstance(weather_info, WeatherInfo):
+            raise ValueError("weather_info 必须是 WeatherInfo")
+        self.push_date = push_date
+        self.weather_info = weather_info
+        self.ai_advice = ai_advice
+        # 使用元组保存列表数据，减少内存占用
+        self.history_events = tuple(history_events)
+        self.hot_searches = tuple(hot_searches)
+        self.daily_image = daily_image
+
+    def to_record(self, push_time, status):
+        """
+        转换为 save_to_database 所需的数据，JSON字段在此处序列化
+        """
+        return {
+            'push_date': self.push_date,
+            'push_time': push_time,
+            'weather_info': self.weather_info.to_json(),
+            'ai_advice': self.ai_advice,
+            'history_events': json.dumps([e.to_raw() for e in self.history_events], ensure_ascii=False),
+            'hot_searches': json.dumps([h.to_raw() for h in self.hot_searches], ensure_ascii=False),
+            'daily_image': self.daily_image,
+            'status': status
+        }
+
+    @classmethod
+    def from_record(cls, row):
+        """
+        从数据库中的一行（DictCursor）还原，用于补数据或批量处理
+        """
+        def load(value):
+            return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+        return cls(
+            push_date=str(row['push_date']),
+            weather_info=WeatherInfo.from_api(load(row['weather_info'])),
+            ai_advice=row.get('ai_advice'),
+            history_events=[HistoryEvent.from_api(e) for e in load(row['history_events'])],
+            hot_searches=[HotSearchItem.from_api(h) for h in load(row['hot_searches'])],
+            daily_image=row.get('daily_image')
+        )
+
+    def __repr__(self):
+        return (f"DailyReport({self.push_date!r}, {self.weather_info.city!r}, "
+                f"{len(self.history_events)} events, {len(self.hot_searches)} hot searches)")
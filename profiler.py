@@ -0,0 +1,180 @@
+"""
+性能分析模式
+
+python main.py --profile
+    以固定间隔对处于各阶段中的线程采样调用栈（墙钟采样，等待网络的线程同样会被采样），
+    输出 flamegraph.pl / speedscope 可直接读取的折叠栈文件（*-wall.collapsed），
+    并用 time.thread_time() 统计各阶段实际占用的CPU时间，输出各阶段耗时报告（*-stages.txt）。
+
+python main.py --profile-memory
+    在上述基础上用 tracemalloc 统计各阶段内存分配前N名。内存追踪本身会明显拖慢
+    分配密集的代码（渲染、JSON序列化），因此单独开启，分析耗时请使用 --profile。
+"""
+import datetime
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profile')
+
+
+class Profiler:
+    """
+    按阶段统计耗时与调用栈采样，trace_memory=True 时同时统计内存分配；
+    enabled=False 时各方法均不做任何事
+    """
+
+    def __init__(self, enabled=False, trace_memory=False, interval=0.005, top_n=10):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.interval = interval
+        self.top_n = top_n
+        # 线程ID -> 当前所处的阶段栈
+        self._thread_stages = {}
+        # 折叠栈 -> 采样次数
+        self._stacks = {}
+        # 阶段名 -> {'calls', 'seconds', 'cpu_seconds', 'samples', 'allocations'}
+        self._stage_stats = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        if not self.enabled:
+            return
+        if self.trace_memory:
+            # 只读取分配位置所在的一帧，减少追踪开销
+            tracemalloc.start(1)
+        self._sampler = threading.Thread(target=self._sample, name='profiler-sampler', daemon=True)
+        self._sampler.start()
+        print(f"\n性能分析已开启: 采样间隔 {self.interval * 1000:.0f}ms"
+              f"{'，内存追踪已开启（耗时数据会偏大）' if self.trace_memory else ''}")
+
+    def stop(self):
+        if not self.enabled or self._sampler is None:
+            return
+        self._stop_event.set()
+        self._sampler.join()
+        if self.trace_memory:
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        标记一个阶段，阶段内的耗时、采样和内存分配都记在该阶段名下
+        """
+        if not self.enabled:
+            yield
+            return
+
+        thread_id = threading.get_ident()
+        before = self._take_snapshot() if self.trace_memory else None
+        with self._lock:
+            self._thread_stages.setdefault(thread_id, []).append(name)
+        start = time.perf_counter()
+        # 阶段在同一线程内执行，thread_time 只统计本线程的CPU时间
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            cpu_elapsed = time.thread_time() - cpu_start
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._thread_stages[thread_id].pop()
+            diffs = self._take_snapshot().compare_to(before, 'lineno') if self.trace_memory else ()
+            self._record_stage(name, elapsed, cpu_elapsed, diffs)
+
+    def wrap(self, name, func):
+        """
+        返回在指定阶段中执行 func 的函数，用于提交到线程池
+        """
+        def run(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return run
+
+    def _take_snapshot(self):
+        # 排除分析器自身和 tracemalloc 的内存分配
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def _stats_for(self, name):
+        return self._stage_stats.setdefault(
+            name, {'calls': 0, 'seconds': 0.0, 'cpu_seconds': 0.0, 'samples': 0, 'allocations': {}})
+
+    def _record_stage(self, name, elapsed, cpu_elapsed, diffs):
+        with self._lock:
+            stats = self._stats_for(name)
+            stats['calls'] += 1
+            stats['seconds'] += elapsed
+            stats['cpu_seconds'] += cpu_elapsed
+            for diff in diffs:
+                if not diff.size_diff:
+                    continue
+                frame = diff.traceback[0]
+                key = f"{frame.filename}:{frame.lineno}"
+                size, count = stats['allocations'].get(key, (0, 0))
+                stats['allocations'][key] = (size + diff.size_diff, count + diff.count_diff)
+
+    def _sample(self):
+        """
+        采样线程：只采样处于阶段中的线程，栈底为阶段名
+        """
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            # 阶段栈由各工作线程修改，在锁内读取当前阶段
+            with self._lock:
+                current = [(thread_id, stages[-1]) for thread_id, stages in self._thread_stages.items() if stages]
+            for thread_id, stage in current:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ';'.join([stage] + stack[::-1])
+                with self._lock:
+                    self._stacks[key] = self._stacks.get(key, 0) + 1
+                    self._stats_for(stage)['samples'] += 1
+
+    def write(self, output_dir=PROFILE_DIR):
+        """
+        写出折叠栈文件和各阶段报告，返回两个文件的路径
+        """
+        if not self.enabled:
+            return None
+        os.makedirs(output_dir, exist_ok=True)
+        prefix = os.path.join(output_dir, datetime.datetime.now().strftime('profile-%Y%m%d-%H%M%S'))
+
+        collapsed_path = prefix + '-wall.collapsed'
+        with open(collapsed_path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self._stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+        report_path = prefix + '-stages.txt'
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write("各阶段耗时（耗时为墙钟时间，CPU时间为阶段所在线程实际占用的CPU时间）\n")
+            if self.trace_memory:
+                f.write("内存追踪已开启：耗时包含追踪开销；并发执行的阶段之间，内存统计可能包含同时运行的其他阶段\n")
+            for name, stats in self._stage_stats.items():
+                f.write(f"\n===== {name} =====\n")
+                f.write(f"调用次数: {stats['calls']}  总耗时: {stats['seconds']:.3f} 秒  "
+                        f"CPU时间: {stats['cpu_seconds']:.3f} 秒  墙钟采样数: {stats['samples']}")
+                if not self.trace_memory:
+                    f.write("\n")
+                    continue
+                allocations = sorted(stats['allocations'].items(), key=lambda item: -abs(item[1][0]))
+                net = sum(size for size, _ in stats['allocations'].values())
+                f.write(f"  净分配: {net / 1024:+.1f} KiB\n")
+                for location, (size, count) in allocations[:self.top_n]:
+                    f.write(f"  {size / 1024:+10.1f} KiB  {count:+7d} 块  {location}\n")
+
+        print(f"\n性能分析结果已保存:")
+        print(f"  折叠栈（墙钟采样）: {collapsed_path}（可用 flamegraph.pl 或 speedscope 查看）")
+        print(f"  阶段报告: {report_path}")
+        return collapsed_path, report_path
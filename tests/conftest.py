@@ -0,0 +1,22 @@
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# config.py 不在仓库中（含敏感信息），测试时提供最小配置
+if 'config' not in sys.modules:
+    config = types.ModuleType('config')
+    config.DB_CONFIG = {'cursorclass': 'pymysql.cursors.DictCursor'}
+    config.API_KEYS = {'ai_api_key': 'test-key', 'pushplus_token': 'test-token'}
+    config.API_URLS = {
+        'message_url': 'http://127.0.0.1/send',
+        'weather_url': 'http://127.0.0.1/weather',
+        'history_url': 'http://127.0.0.1/history',
+        'weibohot_url': 'http://127.0.0.1/weibohot',
+        'ai_url': 'http://127.0.0.1/ai',
+        'image_url': 'http://127.0.0.1/image'
+    }
+    config.DEBUG = False
+    sys.modules['config'] = config
@@ -0,0 +1,171 @@
+import datetime
+import json
+import os
+
+import archive
+
+
+def make_row(row_id, push_date):
+    return {
+        'id': row_id,
+        'push_date': push_date,
+        'push_time': datetime.timedelta(hours=8, seconds=5),
+        'weather_info': json.dumps({'city': '杭州', 'temp': 20}, ensure_ascii=False),
+        'ai_advice': '今天天气不错',
+        'history_events': json.dumps(['1900年 某事件'], ensure_ascii=False),
+        'hot_searches': json.dumps([{'title': '热搜', 'hot': 100}], ensure_ascii=False),
+        'daily_image': None,
+        'status': 'success',
+        'created_at': datetime.datetime(2026, 1, 1, 8, 0, 0),
+        'updated_at': datetime.datetime(2026, 1, 1, 8, 0, 0),
+    }
+
+
+class FakeCursor:
+    """
+    只实现 archive_expired_pushes 用到的几条查询
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.query = None
+        self.params = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, query, params=()):
+        self.query, self.params = query, params
+        if query.startswith('DELETE'):
+            ids = set(params)
+            deleted = [r for r in self.db.rows if r['id'] in ids]
+            # 删除前该月的归档文件必须已经写好
+            for month in {r['push_date'].strftime('%Y-%m') for r in deleted}:
+                assert os.path.exists(os.path.join(self.db.archive_dir, archive.archive_file_name(month)))
+            self.db.deleted.append(sorted(ids))
+            self.db.rows = [r for r in self.db.rows if r['id'] not in ids]
+
+    def fetchone(self):
+        if self.query.startswith('SHOW TABLES'):
+            return {'table': 'daily_pushes'}
+        dates = [r['push_date'] for r in self.db.rows if r['push_date'] < self.params[0]]
+        return {'first_date': min(dates) if dates else None}
+
+    def fetchall(self):
+        start, end = self.params
+        rows = sorted((r for r in self.db.rows if start <= r['push_date'] < end),
+                      key=lambda r: (r['push_date'], r['id']))
+        # 模拟导出之后、删除之前其他连接写入的数据
+        self.db.rows.extend(self.db.concurrent_rows.pop(start, []))
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, rows, archive_dir):
+        self.rows = rows
+        self.archive_dir = archive_dir
+        self.deleted = []
+        self.concurrent_rows = {}
+        self.open = True
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+
+def run_archive(monkeypatch, conn, archive_dir):
+    monkeypatch.setattr(archive, 'get_connection', lambda: conn)
+    return archive.archive_expired_pushes(hot_days=90, archive_dir=str(archive_dir),
+                                          today=datetime.date(2026, 10, 19))
+
+
+def test_archives_whole_months_before_cutoff(tmp_path, monkeypatch):
+    conn = FakeConnection([
+        make_row(1, datetime.date(2026, 5, 3)),
+        make_row(2, datetime.date(2026, 5, 20)),
+        make_row(3, datetime.date(2026, 6, 30)),
+        # 截止日期为 2026-07-01，7月及之后的数据保留在数据库中
+        make_row(4, datetime.date(2026, 7, 1)),
+        make_row(5, datetime.date(2026, 9, 1)),
+    ], str(tmp_path))
+
+    assert run_archive(monkeypatch, conn, tmp_path) == 3
+    assert conn.deleted == [[1, 2], [3]]
+    assert [r['id'] for r in conn.rows] == [4, 5]
+
+    index = archive.load_index(str(tmp_path))
+    assert sorted(index) == ['2026-05', '2026-06']
+    assert index['2026-05']['rows'] == 2
+    assert index['2026-05']['first_date'] == '2026-05-03'
+    assert index['2026-05']['last_date'] == '2026-05-20'
+
+    rows = archive.read_archive_file(str(tmp_path / 'daily_pushes-2026-05.jsonl.gz'))
+    assert rows[0]['push_time'] == '08:00:05'
+    assert rows[0]['weather_info'] == {'city': '杭州', 'temp': 20}
+
+
+def test_rows_written_during_archiving_are_kept(tmp_path, monkeypatch):
+    conn = FakeConnection([make_row(1, datetime.date(2026, 5, 3))], str(tmp_path))
+    conn.concurrent_rows[datetime.date(2026, 5, 1)] = [make_row(2, datetime.date(2026, 5, 4))]
+
+    assert run_archive(monkeypatch, conn, tmp_path) == 1
+    assert conn.deleted == [[1]]
+    assert [r['id'] for r in conn.rows] == [2]
+
+    # 下次运行时归档并合并到同一个月
+    assert run_archive(monkeypatch, conn, tmp_path) == 1
+    rows = archive.read_archive_file(str(tmp_path / 'daily_pushes-2026-05.jsonl.gz'))
+    assert [r['id'] for r in rows] == [1, 2]
+
+
+def test_deletes_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, 'DELETE_BATCH', 2)
+    conn = FakeConnection([make_row(i, datetime.date(2026, 5, i)) for i in range(1, 6)], str(tmp_path))
+    assert run_archive(monkeypatch, conn, tmp_path) == 5
+    assert conn.deleted == [[1, 2], [3, 4], [5]]
+    assert conn.rows == []
+
+
+def test_rerun_merges_into_existing_month(tmp_path, monkeypatch):
+    conn = FakeConnection([make_row(1, datetime.date(2026, 6, 1))], str(tmp_path))
+    run_archive(monkeypatch, conn, tmp_path)
+
+    # 再次运行：同一id的行被覆盖，新行追加，不产生重复
+    updated = make_row(1, datetime.date(2026, 6, 1))
+    updated['status'] = 'failed'
+    conn.rows = [updated, make_row(7, datetime.date(2026, 6, 15))]
+    assert run_archive(monkeypatch, conn, tmp_path) == 2
+
+    rows = archive.read_archive_file(str(tmp_path / 'daily_pushes-2026-06.jsonl.gz'))
+    assert [(r['id'], r['status']) for r in rows] == [(1, 'failed'), (7, 'success')]
+    assert archive.load_index(str(tmp_path))['2026-06']['rows'] == 2
+
+    # 没有过期数据时不做任何事
+    assert run_archive(monkeypatch, conn, tmp_path) == 0
+
+
+def test_read_archived_pushes_with_date_bounds(tmp_path, monkeypatch):
+    conn = FakeConnection([
+        make_row(1, datetime.date(2026, 4, 30)),
+        make_row(2, datetime.date(2026, 5, 9)),
+        make_row(3, datetime.date(2026, 5, 10)),
+        make_row(4, datetime.date(2026, 6, 30)),
+    ], str(tmp_path))
+    run_archive(monkeypatch, conn, tmp_path)
+
+    rows = list(archive.read_archived_pushes('2026-05-10', '2026-06-30', str(tmp_path)))
+    assert [r['id'] for r in rows] == [3, 4]
+    assert [r['push_date'] for r in archive.read_archived_pushes(end_date='2026-05-09',
+                                                                 archive_dir=str(tmp_path))] == ['2026-04-30', '2026-05-09']
+
+    reports = list(archive.read_archived_reports('2026-06-01', None, str(tmp_path)))
+    assert len(reports) == 1
+    assert reports[0].weather_info.to_json() == json.dumps({'city': '杭州', 'temp': 20}, ensure_ascii=False)
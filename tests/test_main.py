@@ -0,0 +1,100 @@
+import importlib
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import main
+from models import WeatherInfo, HistoryEvent, HotSearchItem, DailyReport
+
+
+def make_report():
+    return DailyReport(
+        push_date='2026-10-19',
+        weather_info=main.get_default_weather_info(),
+        ai_advice=main.get_default_ai_advice(),
+        history_events=main.get_default_history_events(),
+        hot_searches=main.get_default_hot_searches()
+    )
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=5)
+    yield executor
+    executor.shutdown()
+
+
+def submit_stub_stages(executor, history_ready):
+    """
+    历史事件等待 history_ready 后才返回，其余数据源立即返回
+    """
+    def slow_history():
+        history_ready.wait(5)
+        return (HistoryEvent('1900年 迟到的历史事件'),)
+
+    return {
+        'weather': executor.submit(lambda: WeatherInfo.from_api({'city': '杭州', 'temp': 20})),
+        'history': executor.submit(slow_history),
+        'hot_searches': executor.submit(lambda: (HotSearchItem('准时的热搜', 100),)),
+        'image': executor.submit(lambda: None),
+        'ai': executor.submit(lambda: '今天适合出门哦'),
+    }
+
+
+def test_slow_source_is_pending_then_followed_up(executor):
+    history_ready = threading.Event()
+    report = make_report()
+    stage_futures = submit_stub_stages(executor, history_ready)
+
+    status, late_futures = main.wait_for_stages(stage_futures, 0.2, report)
+    assert status == {'weather': 'success', 'history': 'pending', 'hot_searches': 'success',
+                      'image': 'failed', 'ai': 'success'}
+    assert list(late_futures) == ['history']
+    assert report.weather_info.city == '杭州'
+
+    content = main.render_report(report, status)
+    assert f'历史数据仍在获取中，{main.PENDING_HINT}' in content
+    assert '以下内容仍在获取中：历史事件' in content
+    assert '迟到的历史事件' not in content
+
+    history_ready.set()
+    late_arrived = main.collect_late_stages(late_futures, report, status)
+    assert late_arrived == ['history']
+    assert status['history'] == 'success'
+    assert report.history_events[0].text == '1900年 迟到的历史事件'
+    assert '迟到的历史事件' in report.to_record('08:00:00', 'success')['history_events']
+
+    followup = main.render_followup(report, status, late_arrived)
+    assert '📜 历史上的今天' in followup
+    assert '迟到的历史事件' in followup
+    assert '🌤️ 今日天气' not in followup
+    assert '🔥 微博热搜' not in followup
+    assert '🖼️ 每日一图' not in followup
+
+
+def test_late_source_that_fails_is_not_followed_up(executor):
+    history_ready = threading.Event()
+    report = make_report()
+    stage_futures = submit_stub_stages(executor, history_ready)
+    stage_futures['history'] = executor.submit(lambda: history_ready.wait(5) and None)
+
+    status, late_futures = main.wait_for_stages(stage_futures, 0.2, report)
+    assert status['history'] == 'pending'
+    history_ready.set()
+    assert main.collect_late_stages(late_futures, report, status) == []
+    assert status['history'] == 'failed'
+
+
+@pytest.mark.parametrize('late_followup, hint', [(True, '稍后补发'), (False, '稍后补充到推送记录')])
+def test_pending_hint_follows_late_followup(monkeypatch, late_followup, hint):
+    monkeypatch.setattr(sys.modules['config'], 'PUSH_CONFIG', {'late_followup': late_followup}, raising=False)
+    try:
+        reloaded = importlib.reload(main)
+        assert reloaded.PENDING_HINT == hint
+        content = reloaded.render_history_section((), 'pending')
+        assert f'历史数据仍在获取中，{hint}' in content
+    finally:
+        monkeypatch.undo()
+        importlib.reload(main)
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from models import UNKNOWN, WeatherInfo, HistoryEvent, HotSearchItem, DailyReport
+
+
+@pytest.mark.parametrize('data', [None, ['city', '杭州'], '{"city": "杭州"}'])
+def test_weather_from_api_rejects_non_dict(data):
+    with pytest.raises(ValueError):
+        WeatherInfo.from_api(data)
+
+
+def test_weather_missing_fields_render_as_placeholder():
+    weather = WeatherInfo.from_api({'city': '杭州', 'temp': 20, 'rh': None, 'wind': ''})
+    assert weather.city == '杭州'
+    assert weather.temp == '20'
+    assert weather.feels_like == UNKNOWN
+    assert weather.rh == UNKNOWN
+    assert weather.wind == UNKNOWN
+    # 占位值只用于渲染，不写入数据
+    assert json.loads(weather.to_json()) == {'city': '杭州', 'temp': 20, 'rh': None, 'wind': ''}
+
+
+def test_weather_to_json_keeps_unknown_fields_and_types():
+    data = {'city': '杭州', 'temp': 20, 'aqi': 40, 'sunrise': '06:05'}
+    assert json.loads(WeatherInfo.from_api(data).to_json()) == data
+
+
+def test_hot_search_hides_empty_and_zero_counts():
+    assert HotSearchItem.from_api({'title': '热搜', 'hot': 0}).hot == ''
+    assert HotSearchItem.from_api({'title': '热搜', 'hot': ''}).hot == ''
+    assert HotSearchItem.from_api({'title': '热搜'}).hot == ''
+    assert HotSearchItem.from_api({'title': '热搜', 'hot': 1200}).hot == '1200'
+    assert HotSearchItem.from_api({'hot': 5}).title == '未知标题'
+    plain = HotSearchItem.from_api('纯文本热搜')
+    assert (plain.title, plain.hot) == ('纯文本热搜', '')
+
+
+def test_history_event_text():
+    assert HistoryEvent.from_api('1900年 某事件').text == '1900年 某事件'
+    assert HistoryEvent.from_api({'year': 1900, 'title': '某事件'}).text == '某事件'
+    assert HistoryEvent.from_api(None).text == ''
+
+
+def test_record_round_trip_keeps_upstream_data():
+    weather = {'city': '杭州', 'temp': 20, 'feelsLike': 19.5, 'aqi': 40}
+    history = ['1900年 某事件', {'year': 1950, 'event': '另一事件'}]
+    hot = [{'title': '热搜', 'hot': 0, 'url': 'https://s.weibo.com/1'}, {'title': '无热度'}, '纯文本热搜']
+    report = DailyReport(
+        push_date='2026-10-19',
+        weather_info=WeatherInfo.from_api(weather),
+        ai_advice='今天适合出门',
+        history_events=[HistoryEvent.from_api(e) for e in history],
+        hot_searches=[HotSearchItem.from_api(h) for h in hot],
+        daily_image='https://img.example.com/a.jpg'
+    )
+
+    record = report.to_record('08:00:00', 'success')
+    assert json.loads(record['weather_info']) == weather
+    assert json.loads(record['history_events']) == history
+    assert json.loads(record['hot_searches']) == hot
+
+    restored = DailyReport.from_record(record)
+    assert restored.to_record('08:00:00', 'success') == record
+    assert restored.history_events[1].text == '另一事件'
+    assert restored.hot_searches[0].hot == ''
+
+
+def test_default_items_serialize_like_before():
+    record = DailyReport('2026-10-19', WeatherInfo(weather='数据获取失败'), None,
+                         [HistoryEvent('历史数据获取失败')], [HotSearchItem('热搜数据获取失败')]).to_record('08:00:00', 'failed')
+    assert json.loads(record['history_events']) == ['历史数据获取失败']
+    assert json.loads(record['hot_searches']) == [{'title': '热搜数据获取失败', 'hot': ''}]
+    assert json.loads(record['weather_info'])['city'] == UNKNOWN
@@ -0,0 +1,52 @@
+import tracemalloc
+
+from profiler import Profiler
+
+
+def run_stages(profiler):
+    profiler.start()
+    with profiler.stage('render'):
+        data = [str(i) * 10 for i in range(20000)]
+    profiler.stop()
+    return data
+
+
+def test_profile_does_not_trace_memory(tmp_path):
+    profiler = Profiler(enabled=True)
+    run_stages(profiler)
+    assert not tracemalloc.is_tracing()
+
+    stats = profiler._stage_stats['render']
+    assert stats['calls'] == 1
+    assert stats['seconds'] > 0
+    assert stats['allocations'] == {}
+
+    _, report_path = profiler.write(str(tmp_path))
+    with open(report_path, encoding='utf-8') as f:
+        report = f.read()
+    assert 'CPU时间' in report
+    assert '净分配' not in report
+
+
+def test_profile_memory_traces_one_frame(tmp_path, monkeypatch):
+    limits = []
+    start = tracemalloc.start
+    monkeypatch.setattr(tracemalloc, 'start', lambda nframe=1: limits.append(nframe) or start(nframe))
+
+    profiler = Profiler(enabled=True, trace_memory=True)
+    run_stages(profiler)
+    assert limits == [1]
+    assert not tracemalloc.is_tracing()
+    assert profiler._stage_stats['render']['allocations']
+
+    _, report_path = profiler.write(str(tmp_path))
+    with open(report_path, encoding='utf-8') as f:
+        assert '净分配' in f.read()
+
+
+def test_disabled_profiler_does_nothing(tmp_path):
+    profiler = Profiler(trace_memory=True)
+    assert not profiler.trace_memory
+    run_stages(profiler)
+    assert profiler.write(str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []